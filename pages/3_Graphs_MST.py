@@ -1,7 +1,10 @@
 import streamlit as st
 import networkx as nx
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
+import time
+from collections import deque
 
 st.set_page_config(layout="wide")
 # ---------------------------
@@ -22,6 +25,86 @@ st.markdown("""
 """, unsafe_allow_html=True)
 st.title("🌐  Graph Lab")
 
+# ------------------------------------------
+# CSR Traversal Engine
+# ------------------------------------------
+# The graph is compacted once into CSR (compressed sparse row) arrays: node i's
+# neighbours are indices[indptr[i]:indptr[i + 1]], as integer ids. `nodes` maps
+# ids back to labels and `node_id` maps labels to ids. BFS/DFS then run over
+# the integer arrays with a bytearray visited set.
+
+GRAPH_DRAW_MAX_NODES = 100  # larger graphs skip the layout, every drawing and the node/edge dumps
+TRAVERSAL_DRAW_MAX_STEPS = 30
+TRAVERSAL_STEP_PREVIEW = 100
+
+def csr_from_edges(src, dst, n, directed):
+    if not directed:
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+    # Stable sort by source keeps each node's neighbours in edge order
+    order = np.argsort(src, kind="stable")
+    indices = dst[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, indices
+
+def to_csr(G):
+    nodes = list(G.nodes())
+    node_id = {v: i for i, v in enumerate(nodes)}
+    m = G.number_of_edges()
+    src = np.fromiter((node_id[u] for u, _ in G.edges()), dtype=np.int64, count=m)
+    dst = np.fromiter((node_id[v] for _, v in G.edges()), dtype=np.int64, count=m)
+    indptr, indices = csr_from_edges(src, dst, len(nodes), G.is_directed())
+    return indptr, indices, nodes, node_id
+
+def csr_bfs(indptr, indices, source):
+    n = len(indptr) - 1
+    visited = bytearray(n)
+    parent = np.full(n, -1, dtype=np.int64)
+    depth = np.full(n, -1, dtype=np.int64)
+    # memoryviews read and write the numpy buffers without boxing numpy scalars
+    ptr, adj, par, dep = memoryview(indptr), memoryview(indices), memoryview(parent), memoryview(depth)
+    order = []
+    visited[source] = 1
+    dep[source] = 0
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        order.append(v)
+        d = dep[v] + 1
+        for w in adj[ptr[v]:ptr[v + 1]]:
+            if not visited[w]:
+                visited[w] = 1
+                par[w] = v
+                dep[w] = d
+                queue.append(w)
+    return np.array(order, dtype=np.int64), parent, depth
+
+def csr_dfs(indptr, indices, source):
+    # Preorder DFS with an explicit stack. Neighbours are pushed in reverse, so
+    # they are explored in adjacency order, as a recursive DFS would.
+    n = len(indptr) - 1
+    visited = bytearray(n)
+    parent = np.full(n, -1, dtype=np.int64)
+    depth = np.full(n, -1, dtype=np.int64)
+    ptr, adj, par, dep = memoryview(indptr), memoryview(indices), memoryview(parent), memoryview(depth)
+    order = []
+    stack = [(source, -1)]
+    while stack:
+        v, p = stack.pop()
+        if visited[v]:
+            continue
+        visited[v] = 1
+        order.append(v)
+        if p >= 0:
+            par[v] = p
+            dep[v] = dep[p] + 1
+        else:
+            dep[v] = 0
+        for w in adj[ptr[v]:ptr[v + 1]][::-1]:
+            if not visited[w]:
+                stack.append((w, v))
+    return np.array(order, dtype=np.int64), parent, depth
+
 # ------------------------------------------
 # Graph Type & Weighted toggle
 # ------------------------------------------
@@ -57,19 +140,38 @@ for e in edges:
             u, v = parts[0].strip(), parts[1].strip()
             G.add_edge(u, v, weight=1)
 
-st.write(f"**Nodes:** {list(G.nodes())}")
-st.write(f"**Edges:** {list(G.edges(data=True))}")
+# The spring layout and labelled drawings take minutes on graphs with thousands
+# of nodes, so they only run for small graphs and the layout only when drawn
+drawable = G.number_of_nodes() <= GRAPH_DRAW_MAX_NODES
+layout_cache = {}
+
+def graph_pos():
+    if "pos" not in layout_cache:
+        layout_cache["pos"] = nx.spring_layout(G, seed=42)
+    return layout_cache["pos"]
+
+def skip_drawing():
+    st.caption(f"The graph has {G.number_of_nodes():,} nodes; drawings are skipped above {GRAPH_DRAW_MAX_NODES}.")
+
+if drawable:
+    st.write(f"**Nodes:** {list(G.nodes())}")
+    st.write(f"**Edges:** {list(G.edges(data=True))}")
+else:
+    st.write(f"**Nodes:** {G.number_of_nodes():,} · **Edges:** {G.number_of_edges():,}")
 
 # ------------------------------------------
 # Initial Visual
 # ------------------------------------------
 st.subheader("🖼️ Initial Graph Visual")
 
-pos = nx.spring_layout(G, seed=42)
-fig, ax = plt.subplots(figsize=(8, 6))
-nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
-nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
-st.pyplot(fig)
+if drawable:
+    pos = graph_pos()
+    fig, ax = plt.subplots(figsize=(8, 6))
+    nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+    st.pyplot(fig)
+else:
+    skip_drawing()
 
 # ------------------------------------------
 # Representations
@@ -108,6 +210,60 @@ with col2:
 st.subheader("🚶 Traversals")
 start_node = st.text_input("Start Node for Traversal", value="A")
 
+# Compact the graph once; both traversals run over the same CSR arrays
+t0 = time.perf_counter()
+indptr, indices, nodes, node_id = to_csr(G)
+csr_time = time.perf_counter() - t0
+
+def show_traversal(name, color, traverse):
+    t0 = time.perf_counter()
+    order, parent, depth = traverse(indptr, indices, node_id[start_node])
+    seconds = time.perf_counter() - t0
+    labels = [nodes[i] for i in order.tolist()]
+    parents = ["" if p < 0 else nodes[p] for p in parent[order].tolist()]
+    depths = depth[order].tolist()
+
+    st.write(f"**{name} Steps:**")
+    for i in range(min(len(labels), TRAVERSAL_STEP_PREVIEW)):
+        via = f" (from {parents[i]}, depth {depths[i]})" if parents[i] != "" else " (start)"
+        st.write(f"Step {i+1}: {labels[i]}{via}")
+    if len(labels) > TRAVERSAL_STEP_PREVIEW:
+        st.caption(f"Showing the first {TRAVERSAL_STEP_PREVIEW} of {len(labels):,} steps; the CSV has them all.")
+
+    st.subheader(f"{name} Traversal Visualization")
+    if not drawable:
+        skip_drawing()
+    else:
+        pos = graph_pos()
+        # Step at which each node is visited (unreached nodes never light up)
+        visited_at = np.full(len(nodes), len(nodes), dtype=np.int64)
+        visited_at[order] = np.arange(len(order))
+        visited_at = visited_at.tolist()
+        for i in range(min(len(labels), TRAVERSAL_DRAW_MAX_STEPS)):
+            fig, ax = plt.subplots(figsize=(8, 6))
+            node_colors = [color if visited_at[j] <= i else "skyblue" for j in range(len(nodes))]
+            nx.draw(G, pos, with_labels=True, node_color=node_colors, node_size=700, ax=ax)
+            nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+            st.pyplot(fig)
+            plt.close(fig)
+            st.caption(f"Step {i+1}: Visited {labels[:i+1]}")
+        if len(labels) > TRAVERSAL_DRAW_MAX_STEPS:
+            st.caption(f"Drew the first {TRAVERSAL_DRAW_MAX_STEPS} of {len(labels):,} steps.")
+
+    st.info("**Time Complexity:** O(V + E)")
+    st.caption(f"Reached {len(labels):,} of {len(nodes):,} nodes in {seconds * 1000:.3f} ms "
+               f"(CSR build {csr_time * 1000:.3f} ms).")
+
+    df_steps = pd.DataFrame({"Step": range(1, len(labels) + 1), "Node": labels,
+                             "Parent": parents, "Depth": depths})
+    csv_steps = df_steps.to_csv(index=False).encode()
+    st.download_button(
+        f"⬇️ Download {name} Steps CSV",
+        csv_steps,
+        f"{name.lower()}_steps.csv",
+        "text/csv"
+    )
+
 traversal_col1, traversal_col2 = st.columns(2)
 
 # BFS
@@ -116,40 +272,7 @@ with traversal_col1:
         if start_node not in G:
             st.error("Start node not in graph!")
         else:
-            visited = []
-            queue = [start_node]
-            steps = []
-
-            while queue:
-                v = queue.pop(0)
-                if v not in visited:
-                    visited.append(v)
-                    queue.extend(set(G[v]) - set(visited))
-                    steps.append(visited.copy())
-
-            st.write("**BFS Steps:**")
-            for i, step in enumerate(steps):
-                st.write(f"Step {i+1}: {step}")
-
-            st.subheader("BFS Traversal Visualization")
-            for i, step in enumerate(steps):
-                fig, ax = plt.subplots(figsize=(8, 6))
-                node_colors = ["lightgreen" if node in step else "skyblue" for node in G.nodes()]
-                nx.draw(G, pos, with_labels=True, node_color=node_colors, node_size=700, ax=ax)
-                nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
-                st.pyplot(fig)
-                st.caption(f"Step {i+1}: Visited {step}")
-
-            st.info("**Time Complexity:** O(V + E)")
-
-            df_bfs = pd.DataFrame({"Step": [i+1 for i in range(len(steps))], "Visited": steps})
-            csv_bfs = df_bfs.to_csv(index=False).encode()
-            st.download_button(
-                "⬇️ Download BFS Steps CSV",
-                csv_bfs,
-                "bfs_steps.csv",
-                "text/csv"
-            )
+            show_traversal("BFS", "lightgreen", csr_bfs)
 
 # DFS
 with traversal_col2:
@@ -157,40 +280,29 @@ with traversal_col2:
         if start_node not in G:
             st.error("Start node not in graph!")
         else:
-            visited = []
-            stack = [start_node]
-            steps = []
-
-            while stack:
-                v = stack.pop()
-                if v not in visited:
-                    visited.append(v)
-                    stack.extend(reversed(list(set(G[v]) - set(visited))))
-                    steps.append(visited.copy())
-
-            st.write("**DFS Steps:**")
-            for i, step in enumerate(steps):
-                st.write(f"Step {i+1}: {step}")
-
-            st.subheader("DFS Traversal Visualization")
-            for i, step in enumerate(steps):
-                fig, ax = plt.subplots(figsize=(8, 6))
-                node_colors = ["orange" if node in step else "skyblue" for node in G.nodes()]
-                nx.draw(G, pos, with_labels=True, node_color=node_colors, node_size=700, ax=ax)
-                nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
-                st.pyplot(fig)
-                st.caption(f"Step {i+1}: Visited {step}")
-
-            st.info("**Time Complexity:** O(V + E)")
+            show_traversal("DFS", "orange", csr_dfs)
 
-            df_dfs = pd.DataFrame({"Step": [i+1 for i in range(len(steps))], "Visited": steps})
-            csv_dfs = df_dfs.to_csv(index=False).encode()
-            st.download_button(
-                "⬇️ Download DFS Steps CSV",
-                csv_dfs,
-                "dfs_steps.csv",
-                "text/csv"
-            )
+# ------------------------------------------
+# Traversal Engine on Large Graphs
+# ------------------------------------------
+st.subheader("⚡ Traversal Engine on Large Graphs")
+big_edges = st.select_slider("Random edges", [10_000, 100_000, 1_000_000], value=100_000)
+big_nodes = big_edges // 5
+
+if st.button("Run Large Traversal"):
+    rng = np.random.default_rng(42)
+    src = rng.integers(0, big_nodes, big_edges)
+    dst = rng.integers(0, big_nodes, big_edges)
+    rows = []
+    t0 = time.perf_counter()
+    big_indptr, big_indices = csr_from_edges(src, dst, big_nodes, directed == "Directed")
+    rows.append({"Step": "Build CSR", "Seconds": time.perf_counter() - t0, "Reached": big_nodes})
+    for name, traverse in [("BFS", csr_bfs), ("DFS", csr_dfs)]:
+        t0 = time.perf_counter()
+        order, _, depth = traverse(big_indptr, big_indices, 0)
+        rows.append({"Step": name, "Seconds": time.perf_counter() - t0, "Reached": len(order)})
+    st.dataframe(pd.DataFrame(rows).round(4), hide_index=True)
+    st.caption(f"{directed} random graph: {big_nodes:,} nodes, {big_edges:,} edges.")
 
 # ------------------------------------------
 # Dijkstra
@@ -228,12 +340,16 @@ if st.button("Run Dijkstra"):
                 if len(path) > 1:
                     tree_edges.extend([(path[i], path[i+1]) for i in range(len(path)-1)])
 
-            fig, ax = plt.subplots(figsize=(8, 6))
-            nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
-            nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
-            nx.draw_networkx_edges(G, pos, edgelist=tree_edges, edge_color='red', width=2.5, ax=ax)
-            st.pyplot(fig)
-            st.caption("Red edges show shortest-path tree from source node.")
+            if drawable:
+                pos = graph_pos()
+                fig, ax = plt.subplots(figsize=(8, 6))
+                nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
+                nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+                nx.draw_networkx_edges(G, pos, edgelist=tree_edges, edge_color='red', width=2.5, ax=ax)
+                st.pyplot(fig)
+                st.caption("Red edges show shortest-path tree from source node.")
+            else:
+                skip_drawing()
 
         except Exception as e:
             st.error(f"Error: {e}")
@@ -276,12 +392,16 @@ if st.button("Run Bellman-Ford"):
                 if len(path) > 1:
                     tree_edges.extend([(path[i], path[i+1]) for i in range(len(path)-1)])
 
-            fig, ax = plt.subplots(figsize=(8, 6))
-            nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
-            nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
-            nx.draw_networkx_edges(G, pos, edgelist=tree_edges, edge_color='red', width=2.5, ax=ax)
-            st.pyplot(fig)
-            st.caption("Red edges show Bellman-Ford shortest-path tree.")
+            if drawable:
+                pos = graph_pos()
+                fig, ax = plt.subplots(figsize=(8, 6))
+                nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
+                nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+                nx.draw_networkx_edges(G, pos, edgelist=tree_edges, edge_color='red', width=2.5, ax=ax)
+                st.pyplot(fig)
+                st.caption("Red edges show Bellman-Ford shortest-path tree.")
+            else:
+                skip_drawing()
             st.info("**Time Complexity:** O(V × E)")
 
         except nx.NetworkXUnbounded:
@@ -321,8 +441,12 @@ if directed == "Undirected":
                 "text/csv"
             )
 
-            fig, ax = plt.subplots(figsize=(8, 6))
-            nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
-            nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
-            nx.draw_networkx_edges(G, pos, edgelist=mst.edges(), edge_color='red', width=2.5, ax=ax)
-            st.pyplot(fig)
+            if drawable:
+                pos = graph_pos()
+                fig, ax = plt.subplots(figsize=(8, 6))
+                nx.draw(G, pos, with_labels=True, node_color="skyblue", node_size=700, ax=ax)
+                nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+                nx.draw_networkx_edges(G, pos, edgelist=mst.edges(), edge_color='red', width=2.5, ax=ax)
+                st.pyplot(fig)
+            else:
+                skip_drawing()
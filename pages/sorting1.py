@@ -1,11 +1,28 @@
 import streamlit as st
-import random
 import time
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from fpdf import FPDF
 import tempfile
+import tracemalloc
+import hashlib
+import threading
+from collections import OrderedDict
+import shutil
+import heapq
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from io import BytesIO
+from PIL import Image
+from array import array
+from bisect import bisect_right
+from parallel_sort import sort_chunk, merge_segment, run_workers
 
 # ---------------------------
 # Page config & custom CSS
@@ -28,60 +45,190 @@ st.markdown("""
 # ---------------------------
 st.title("Sorting Algorithms - Visualizer, CSV and PDF Export")
 
+# ---------------------------
+# Operation Trace (compact step log)
+# ---------------------------
+# Sorts record primitive operations instead of full-array snapshots:
+# swap(i, j), write(i, v) and compare(i, j), packed into typed arrays, plus
+# alloc(size) for auxiliary buffers. A frame is the array state after each
+# swap/write (compares and allocations are not frames).
+OP_SWAP, OP_WRITE, OP_COMPARE, OP_ALLOC = 0, 1, 2, 3
+# Values are logged in array("q"), so inputs must fit in a signed 64-bit integer
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+class SortTrace:
+    def __init__(self, arr):
+        self.initial = list(arr)
+        self.ops = array("b")
+        self.a = array("q")
+        self.b = array("q")
+
+    def swap(self, i, j):
+        self.ops.append(OP_SWAP)
+        self.a.append(i)
+        self.b.append(j)
+
+    def write(self, i, value):
+        self.ops.append(OP_WRITE)
+        self.a.append(i)
+        self.b.append(value)
+
+    def compare(self, i, j):
+        self.ops.append(OP_COMPARE)
+        self.a.append(i)
+        self.b.append(j)
+
+    def alloc(self, size):
+        self.ops.append(OP_ALLOC)
+        self.a.append(size)
+        self.b.append(0)
+
+    def counts(self):
+        ops = np.frombuffer(self.ops, dtype=np.int8)
+        per_op = np.bincount(ops, minlength=4)
+        sizes = np.frombuffer(self.a, dtype=np.int64)[ops == OP_ALLOC]
+        return {
+            "comparisons": int(per_op[OP_COMPARE]),
+            "swaps": int(per_op[OP_SWAP]),
+            "writes": int(per_op[OP_WRITE]),
+            "allocations": int(per_op[OP_ALLOC]),
+            "allocated_elements": int(sizes.sum()),
+        }
+
+    def __len__(self):
+        return len(self.ops)
+
+    def nbytes(self):
+        return (len(self.ops) * self.ops.itemsize + len(self.a) * self.a.itemsize
+                + len(self.b) * self.b.itemsize)
+
+class TraceReplay:
+    # Checkpoints are taken every `interval` frames; the interval is at least
+    # len(arr) so checkpoint memory stays proportional to the op log itself.
+    def __init__(self, trace, min_interval=256):
+        self.trace = trace
+        self.interval = max(min_interval, len(trace.initial))
+        self.checkpoint_frames = [0]
+        self.checkpoint_ops = [0]
+        self.checkpoint_states = [list(trace.initial)]
+        state = list(trace.initial)
+        frames = 0
+        ops, a, b = trace.ops, trace.a, trace.b
+        for k in range(len(ops)):
+            op = ops[k]
+            if op >= OP_COMPARE:
+                continue
+            if op == OP_SWAP:
+                i, j = a[k], b[k]
+                state[i], state[j] = state[j], state[i]
+            else:
+                state[a[k]] = b[k]
+            frames += 1
+            if frames % self.interval == 0:
+                self.checkpoint_frames.append(frames)
+                self.checkpoint_ops.append(k + 1)
+                self.checkpoint_states.append(list(state))
+        self.n_frames = frames
+        self.final = state
+
+    def _advance(self, state, k, frames, target):
+        ops, a, b = self.trace.ops, self.trace.a, self.trace.b
+        while frames < target:
+            op = ops[k]
+            if op == OP_SWAP:
+                i, j = a[k], b[k]
+                state[i], state[j] = state[j], state[i]
+                frames += 1
+            elif op == OP_WRITE:
+                state[a[k]] = b[k]
+                frames += 1
+            k += 1
+        return k, frames
+
+    def frame(self, f):
+        # Seek: binary search for the nearest checkpoint, then replay forward.
+        if not 0 <= f <= self.n_frames:
+            raise IndexError(f"frame {f} out of range 0..{self.n_frames}")
+        idx = bisect_right(self.checkpoint_frames, f) - 1
+        state = list(self.checkpoint_states[idx])
+        self._advance(state, self.checkpoint_ops[idx], self.checkpoint_frames[idx], f)
+        return state
+
+    def frames(self, indices=None):
+        # Yields (frame_no, state) for increasing frame numbers in one forward pass.
+        if indices is None:
+            indices = range(1, self.n_frames + 1)
+        state = None
+        k = frames = 0
+        for f in indices:
+            if state is None or f < frames or f - frames > self.interval:
+                idx = bisect_right(self.checkpoint_frames, f) - 1
+                state = list(self.checkpoint_states[idx])
+                k, frames = self.checkpoint_ops[idx], self.checkpoint_frames[idx]
+            k, frames = self._advance(state, k, frames, f)
+            yield f, list(state)
+
 # ---------------------------
 # Sorting Algorithm Functions
 # ---------------------------
 def bubble_sort(arr):
-    steps = []
+    trace = SortTrace(arr)
     n = len(arr)
     for i in range(n):
         for j in range(0, n - i - 1):
+            trace.compare(j, j + 1)
             if arr[j] > arr[j + 1]:
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
-                steps.append(arr.copy())
-    return arr, steps
+                trace.swap(j, j + 1)
+    return arr, trace
 
 def insertion_sort(arr):
-    steps = []
+    trace = SortTrace(arr)
     for i in range(1, len(arr)):
         key = arr[i]
         j = i - 1
-        while j >= 0 and key < arr[j]:
+        while j >= 0:
+            trace.compare(j, i)
+            if not key < arr[j]:
+                break
             arr[j + 1] = arr[j]
+            trace.write(j + 1, arr[j])
             j -= 1
-            steps.append(arr.copy())
         arr[j + 1] = key
-        steps.append(arr.copy())
-    return arr, steps
+        trace.write(j + 1, key)
+    return arr, trace
 
 def merge_sort(arr):
-    steps = []
+    trace = SortTrace(arr)
     def merge(arr, l, m, r):
         n1 = m - l + 1
         n2 = r - m
         L = arr[l:m+1]
         R = arr[m+1:r+1]
+        trace.alloc(n1)
+        trace.alloc(n2)
         i = j = 0
         k = l
         while i < n1 and j < n2:
+            trace.compare(l + i, m + 1 + j)
             if L[i] <= R[j]:
                 arr[k] = L[i]
                 i += 1
             else:
                 arr[k] = R[j]
                 j += 1
+            trace.write(k, arr[k])
             k += 1
-            steps.append(arr.copy())
         while i < n1:
             arr[k] = L[i]
+            trace.write(k, arr[k])
             i += 1
             k += 1
-            steps.append(arr.copy())
         while j < n2:
             arr[k] = R[j]
+            trace.write(k, arr[k])
             j += 1
             k += 1
-            steps.append(arr.copy())
     def mergeSort(arr, l, r):
         if l < r:
             m = (l + r) // 2
@@ -89,20 +236,59 @@ def merge_sort(arr):
             mergeSort(arr, m + 1, r)
             merge(arr, l, m, r)
     mergeSort(arr, 0, len(arr) - 1)
-    return arr, steps
+    return arr, trace
+
+def natural_merge_sort(arr):
+    # Bottom-up merge of the ascending runs already present in the input,
+    # so nearly sorted arrays finish in a pass or two.
+    trace = SortTrace(arr)
+    n = len(arr)
+    while True:
+        bounds = [0]
+        for i in range(1, n):
+            trace.compare(i - 1, i)
+            if arr[i] < arr[i - 1]:
+                bounds.append(i)
+        bounds.append(n)
+        if len(bounds) <= 2:
+            break
+        for s in range(0, len(bounds) - 2, 2):
+            l, m, r = bounds[s], bounds[s + 1], bounds[s + 2]
+            L = arr[l:m]
+            R = arr[m:r]
+            trace.alloc(len(L))
+            trace.alloc(len(R))
+            i = j = 0
+            k = l
+            while i < len(L) and j < len(R):
+                trace.compare(l + i, m + j)
+                if L[i] <= R[j]:
+                    arr[k] = L[i]
+                    i += 1
+                else:
+                    arr[k] = R[j]
+                    j += 1
+                trace.write(k, arr[k])
+                k += 1
+            for v in L[i:] + R[j:]:
+                arr[k] = v
+                trace.write(k, v)
+                k += 1
+    return arr, trace
 
 def quick_sort(arr):
-    steps = []
+    trace = SortTrace(arr)
     def partition(low, high):
         pivot = arr[high]
         i = low - 1
         for j in range(low, high):
+            trace.compare(j, high)
             if arr[j] <= pivot:
                 i += 1
                 arr[i], arr[j] = arr[j], arr[i]
-                steps.append(arr.copy())
+                trace.swap(i, j)
         arr[i + 1], arr[high] = arr[high], arr[i + 1]
-        steps.append(arr.copy())
+        trace.swap(i + 1, high)
         return i + 1
     def quickSort(low, high):
         if low < high:
@@ -110,52 +296,195 @@ def quick_sort(arr):
             quickSort(low, pi - 1)
             quickSort(pi + 1, high)
     quickSort(0, len(arr) - 1)
-    return arr, steps
+    return arr, trace
+
+# Introsort: quick sort with an explicit stack (smaller side first, so the
+# stack stays O(log n)), median-of-three / ninther pivots, three-way
+# partitioning for duplicates, insertion sort below INTRO_CUTOFF and a heap
+# sort fallback once the depth budget of 2*log2(n) partitions is spent.
+INTRO_CUTOFF = 16
+
+def introsort(arr):
+    trace = SortTrace(arr)
+
+    def less(i, j):
+        trace.compare(i, j)
+        return arr[i] < arr[j]
+
+    def swap(i, j):
+        arr[i], arr[j] = arr[j], arr[i]
+        trace.swap(i, j)
+
+    def median3(a, b, c):
+        if less(a, b):
+            if less(b, c):
+                return b
+            return c if less(a, c) else a
+        if less(a, c):
+            return a
+        return c if less(b, c) else b
 
-def heapify(arr, n, i, steps):
+    def choose_pivot(lo, hi):
+        mid = (lo + hi) // 2
+        if hi - lo > 40:
+            d = (hi - lo) // 8
+            return median3(median3(lo, lo + d, lo + 2 * d),
+                           median3(mid - d, mid, mid + d),
+                           median3(hi - 2 * d, hi - d, hi))
+        return median3(lo, mid, hi)
+
+    def partition(lo, hi):
+        # Dijkstra three-way partition; arr[lt] always holds the pivot value
+        swap(lo, choose_pivot(lo, hi))
+        pivot = arr[lo]
+        lt, i, gt = lo, lo + 1, hi
+        while i <= gt:
+            trace.compare(i, lt)
+            if arr[i] < pivot:
+                swap(lt, i)
+                lt += 1
+                i += 1
+                continue
+            trace.compare(i, lt)
+            if arr[i] > pivot:
+                swap(i, gt)
+                gt -= 1
+            else:
+                i += 1
+        return lt, gt
+
+    def insertion(lo, hi):
+        for i in range(lo + 1, hi + 1):
+            key = arr[i]
+            j = i - 1
+            while j >= lo:
+                trace.compare(j, i)
+                if not key < arr[j]:
+                    break
+                arr[j + 1] = arr[j]
+                trace.write(j + 1, arr[j])
+                j -= 1
+            if j + 1 != i:
+                arr[j + 1] = key
+                trace.write(j + 1, key)
+
+    def heap(lo, hi):
+        size = hi - lo + 1
+        def sift(i, end):
+            while True:
+                largest = i
+                l = 2 * i + 1
+                r = l + 1
+                if l < end and less(lo + largest, lo + l):
+                    largest = l
+                if r < end and less(lo + largest, lo + r):
+                    largest = r
+                if largest == i:
+                    return
+                swap(lo + i, lo + largest)
+                i = largest
+        for i in range(size // 2 - 1, -1, -1):
+            sift(i, size)
+        for end in range(size - 1, 0, -1):
+            swap(lo, lo + end)
+            sift(0, end)
+
+    n = len(arr)
+    stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo + 1 > INTRO_CUTOFF:
+            if depth == 0:
+                heap(lo, hi)
+                break
+            depth -= 1
+            lt, gt = partition(lo, hi)
+            if lt - lo < hi - gt:
+                stack.append((gt + 1, hi, depth))
+                hi = lt - 1
+            else:
+                stack.append((lo, lt - 1, depth))
+                lo = gt + 1
+        else:
+            insertion(lo, hi)
+    return arr, trace
+
+def heapify(arr, n, i, trace):
     largest = i
     l = 2 * i + 1
     r = 2 * i + 2
-    if l < n and arr[l] > arr[largest]:
-        largest = l
-    if r < n and arr[r] > arr[largest]:
-        largest = r
+    if l < n:
+        trace.compare(l, largest)
+        if arr[l] > arr[largest]:
+            largest = l
+    if r < n:
+        trace.compare(r, largest)
+        if arr[r] > arr[largest]:
+            largest = r
     if largest != i:
         arr[i], arr[largest] = arr[largest], arr[i]
-        steps.append(arr.copy())
-        heapify(arr, n, largest, steps)
+        trace.swap(i, largest)
+        heapify(arr, n, largest, trace)
 
 def heap_sort(arr):
-    steps = []
+    trace = SortTrace(arr)
     n = len(arr)
     for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i, steps)
+        heapify(arr, n, i, trace)
     for i in range(n - 1, 0, -1):
         arr[i], arr[0] = arr[0], arr[i]
-        steps.append(arr.copy())
-        heapify(arr, i, 0, steps)
-    return arr, steps
+        trace.swap(0, i)
+        heapify(arr, i, 0, trace)
+    return arr, trace
+
+# Counting sort allocates one slot per key in [min, max]. That is only worth it
+# (and only safe on a shared worker) when the range is small relative to n and
+# the count array fits the budget; otherwise we count distinct keys in a dict.
+COUNTING_RANGE_FACTOR = 16
+COUNTING_MEMORY_BUDGET = 128 * 1024 * 1024  # bytes
+COUNT_SLOT_BYTES = 8
+
+def counting_plan(arr):
+    if len(arr) == 0:
+        return {"strategy": "dense", "min": 0, "span": 0, "bytes": 0}
+    lo, hi = min(arr), max(arr)
+    span = hi - lo + 1
+    est = span * COUNT_SLOT_BYTES
+    dense = span <= max(COUNTING_RANGE_FACTOR * len(arr), 1024) and est <= COUNTING_MEMORY_BUDGET
+    return {"strategy": "dense" if dense else "sparse", "min": lo, "span": span, "bytes": est}
 
 def counting_sort(arr):
-    steps = []
-    max_val = max(arr)
-    count = [0] * (max_val + 1)
-    for num in arr:
-        count[num] += 1
+    trace = SortTrace(arr)
+    plan = counting_plan(arr)
+    lo = plan["min"]
+    if plan["strategy"] == "dense":
+        count = [0] * plan["span"]
+        trace.alloc(plan["span"])
+        for num in arr:
+            count[num - lo] += 1
+        keys = ((lo + k, c) for k, c in enumerate(count))
+    else:
+        count = {}
+        for num in arr:
+            count[num] = count.get(num, 0) + 1
+        trace.alloc(len(count))
+        keys = ((k, count[k]) for k in sorted(count))
     i = 0
-    for num, c in enumerate(count):
+    for num, c in keys:
         for _ in range(c):
             arr[i] = num
+            trace.write(i, num)
             i += 1
-            steps.append(arr.copy())
-    return arr, steps
+    return arr, trace
 
 def radix_sort(arr):
-    steps = []
+    trace = SortTrace(arr)
     def counting_sort_exp(arr, exp):
         n = len(arr)
         output = [0] * n
         count = [0] * 10
+        trace.alloc(n)
+        trace.alloc(10)
         for i in arr:
             index = i // exp
             count[index % 10] += 1
@@ -169,141 +498,1359 @@ def radix_sort(arr):
             i -= 1
         for i in range(len(arr)):
             arr[i] = output[i]
-            steps.append(arr.copy())
+            trace.write(i, output[i])
     max1 = max(arr)
     exp = 1
     while max1 // exp > 0:
         counting_sort_exp(arr, exp)
         exp *= 10
-    return arr, steps
+    return arr, trace
+
+# ---------------------------
+# NumPy Engines (large integer arrays)
+# ---------------------------
+# Vectorised fast paths for int32/int64 arrays; the Python versions above stay
+# as the teaching path (they record steps, these do not).
+def numpy_counting_sort(a):
+    a = np.asarray(a)
+    if a.size == 0:
+        return a.copy()
+    lo, hi = int(a.min()), int(a.max())
+    span = hi - lo + 1
+    if span <= max(COUNTING_RANGE_FACTOR * a.size, 1024) and span * COUNT_SLOT_BYTES <= COUNTING_MEMORY_BUDGET:
+        counts = np.bincount((a - lo).astype(np.intp), minlength=span)
+        return np.repeat(np.arange(lo, lo + span, dtype=a.dtype), counts)
+    # Wide or sparse range: count the sorted distinct keys instead of every slot
+    keys, counts = np.unique(a, return_counts=True)
+    return np.repeat(keys, counts)
+
+def numpy_radix_sort(a, digit_bits=16):
+    # LSD radix sort on the unsigned image of the keys (sign bit flipped, so
+    # negatives order first). Each pass is a stable argsort of one 8/16-bit
+    # digit, which NumPy itself performs as a counting/radix pass.
+    a = np.asarray(a)
+    if a.dtype not in (np.int32, np.int64):
+        a = a.astype(np.int64)
+    if a.size == 0:
+        return a.copy()
+    bits = a.dtype.itemsize * 8
+    udtype = np.uint32 if bits == 32 else np.uint64
+    sign = udtype(1 << (bits - 1))
+    keys = a.view(udtype) ^ sign
+    digit_dtype = np.uint8 if digit_bits == 8 else np.uint16
+    mask = udtype((1 << digit_bits) - 1)
+    # Bits above the highest one that differs between min and max never reorder anything
+    span_bits = int(keys.min() ^ keys.max()).bit_length()
+    for shift in range(0, span_bits, digit_bits):
+        digit = ((keys >> udtype(shift)) & mask).astype(digit_dtype)
+        if digit.min() == digit.max():
+            continue
+        keys = keys[np.argsort(digit, kind="stable")]
+    return (keys ^ sign).view(a.dtype)
+
+# ---------------------------
+# Uninstrumented Kernels (benchmarking)
+# ---------------------------
+# Same algorithms as above without any step recording, sorting in place.
+def bubble_sort_kernel(arr):
+    n = len(arr)
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+    return arr
+
+def insertion_sort_kernel(arr):
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i - 1
+        while j >= 0 and key < arr[j]:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key
+    return arr
+
+def merge_sort_kernel(arr):
+    def mergeSort(l, r):
+        if l < r:
+            m = (l + r) // 2
+            mergeSort(l, m)
+            mergeSort(m + 1, r)
+            L = arr[l:m+1]
+            R = arr[m+1:r+1]
+            n1, n2 = len(L), len(R)
+            i = j = 0
+            k = l
+            while i < n1 and j < n2:
+                if L[i] <= R[j]:
+                    arr[k] = L[i]
+                    i += 1
+                else:
+                    arr[k] = R[j]
+                    j += 1
+                k += 1
+            arr[k:r+1] = L[i:] if i < n1 else R[j:]
+    mergeSort(0, len(arr) - 1)
+    return arr
+
+def natural_merge_sort_kernel(arr):
+    n = len(arr)
+    while True:
+        bounds = [0] + [i for i in range(1, n) if arr[i] < arr[i - 1]] + [n]
+        if len(bounds) <= 2:
+            return arr
+        for s in range(0, len(bounds) - 2, 2):
+            l, m, r = bounds[s], bounds[s + 1], bounds[s + 2]
+            L = arr[l:m]
+            R = arr[m:r]
+            i = j = 0
+            k = l
+            while i < len(L) and j < len(R):
+                if L[i] <= R[j]:
+                    arr[k] = L[i]
+                    i += 1
+                else:
+                    arr[k] = R[j]
+                    j += 1
+                k += 1
+            arr[k:r] = L[i:] if i < len(L) else R[j:]
+
+def quick_sort_kernel(arr):
+    # Same Lomuto partition; recursing only into the smaller side keeps the
+    # stack O(log n), so adversarial inputs show the O(n^2) time instead of
+    # dying with RecursionError.
+    def quickSort(low, high):
+        while low < high:
+            pivot = arr[high]
+            i = low - 1
+            for j in range(low, high):
+                if arr[j] <= pivot:
+                    i += 1
+                    arr[i], arr[j] = arr[j], arr[i]
+            arr[i + 1], arr[high] = arr[high], arr[i + 1]
+            if i - low < high - i - 2:
+                quickSort(low, i)
+                low = i + 2
+            else:
+                quickSort(i + 2, high)
+                high = i
+    quickSort(0, len(arr) - 1)
+    return arr
+
+def introsort_kernel(arr):
+    def median3(a, b, c):
+        if arr[a] < arr[b]:
+            if arr[b] < arr[c]:
+                return b
+            return c if arr[a] < arr[c] else a
+        if arr[a] < arr[c]:
+            return a
+        return c if arr[b] < arr[c] else b
+
+    def heap(lo, hi):
+        size = hi - lo + 1
+        def sift(i, end):
+            while True:
+                largest = i
+                l = 2 * i + 1
+                r = l + 1
+                if l < end and arr[lo + largest] < arr[lo + l]:
+                    largest = l
+                if r < end and arr[lo + largest] < arr[lo + r]:
+                    largest = r
+                if largest == i:
+                    return
+                arr[lo + i], arr[lo + largest] = arr[lo + largest], arr[lo + i]
+                i = largest
+        for i in range(size // 2 - 1, -1, -1):
+            sift(i, size)
+        for end in range(size - 1, 0, -1):
+            arr[lo], arr[lo + end] = arr[lo + end], arr[lo]
+            sift(0, end)
+
+    n = len(arr)
+    stack = [(0, n - 1, 2 * max(n, 1).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo + 1 > INTRO_CUTOFF:
+            if depth == 0:
+                heap(lo, hi)
+                break
+            depth -= 1
+            mid = (lo + hi) // 2
+            if hi - lo > 40:
+                d = (hi - lo) // 8
+                p = median3(median3(lo, lo + d, lo + 2 * d),
+                            median3(mid - d, mid, mid + d),
+                            median3(hi - 2 * d, hi - d, hi))
+            else:
+                p = median3(lo, mid, hi)
+            pivot = arr[p]
+            lt, i, gt = lo, lo, hi
+            while i <= gt:
+                x = arr[i]
+                if x < pivot:
+                    arr[lt], arr[i] = x, arr[lt]
+                    lt += 1
+                    i += 1
+                elif pivot < x:
+                    arr[i], arr[gt] = arr[gt], x
+                    gt -= 1
+                else:
+                    i += 1
+            if lt - lo < hi - gt:
+                stack.append((gt + 1, hi, depth))
+                hi = lt - 1
+            else:
+                stack.append((lo, lt - 1, depth))
+                lo = gt + 1
+        else:
+            for i in range(lo + 1, hi + 1):
+                key = arr[i]
+                j = i - 1
+                while j >= lo and key < arr[j]:
+                    arr[j + 1] = arr[j]
+                    j -= 1
+                arr[j + 1] = key
+    return arr
+
+def heap_sort_kernel(arr):
+    def sift_down(i, n):
+        while True:
+            largest = i
+            l = 2 * i + 1
+            r = l + 1
+            if l < n and arr[l] > arr[largest]:
+                largest = l
+            if r < n and arr[r] > arr[largest]:
+                largest = r
+            if largest == i:
+                return
+            arr[i], arr[largest] = arr[largest], arr[i]
+            i = largest
+    n = len(arr)
+    for i in range(n // 2 - 1, -1, -1):
+        sift_down(i, n)
+    for i in range(n - 1, 0, -1):
+        arr[i], arr[0] = arr[0], arr[i]
+        sift_down(0, i)
+    return arr
+
+def counting_sort_kernel(arr):
+    plan = counting_plan(arr)
+    lo = plan["min"]
+    if plan["strategy"] == "dense":
+        count = [0] * plan["span"]
+        for num in arr:
+            count[num - lo] += 1
+        keys = ((lo + k, c) for k, c in enumerate(count))
+    else:
+        count = {}
+        for num in arr:
+            count[num] = count.get(num, 0) + 1
+        keys = ((k, count[k]) for k in sorted(count))
+    i = 0
+    for num, c in keys:
+        arr[i:i + c] = [num] * c
+        i += c
+    return arr
+
+def radix_sort_kernel(arr):
+    max1 = max(arr)
+    exp = 1
+    while max1 // exp > 0:
+        buckets = [[] for _ in range(10)]
+        for x in arr:
+            buckets[(x // exp) % 10].append(x)
+        arr[:] = [x for b in buckets for x in b]
+        exp *= 10
+    return arr
+
+# ---------------------------
+# Workload Generator
+# ---------------------------
+# Seeded, vectorised input distributions shared by the page and the benchmarks.
+WORKLOADS = [
+    "Random", "Random permutation", "Sorted", "Reversed", "Nearly sorted",
+    "Organ pipe", "Sawtooth", "Few unique", "Zipfian", "Quick sort killer",
+]
+
+def generate_workload(kind, n, seed=0, max_value=None):
+    rng = np.random.default_rng(seed)
+    max_value = max_value or max(10 * n, 2)
+    if kind == "Random permutation":
+        return rng.permutation(n).astype(np.int64) + 1
+    if kind == "Few unique":
+        return rng.choice(rng.integers(0, max_value, 8), n)
+    if kind == "Zipfian":
+        # Heavy duplicates of small keys with a long tail
+        return np.minimum(rng.zipf(1.5, n), max_value).astype(np.int64)
+    if kind == "Sawtooth":
+        period = max(2, int(np.sqrt(n)))
+        return (np.arange(n, dtype=np.int64) % period) * max(1, max_value // period)
+    if kind == "Quick sort killer":
+        # [1, 2, ..., n-1, 0]: the last element is always the minimum of what is
+        # left, so the Lomuto partition (pivot = arr[high]) peels one element per
+        # level: n levels, n^2/2 comparisons.
+        return np.roll(np.arange(n, dtype=np.int64), -1) * max(1, max_value // max(n, 1))
+
+    a = rng.integers(0, max_value, n)
+    if kind == "Random":
+        return a
+    a.sort()
+    if kind == "Sorted":
+        return a
+    if kind == "Reversed":
+        return a[::-1].copy()
+    if kind == "Nearly sorted":
+        # k = 1% random swaps between distinct positions
+        k = min(max(1, n // 100), n // 2)
+        pos = rng.choice(n, 2 * k, replace=False)
+        a[pos[:k]], a[pos[k:]] = a[pos[k:]], a[pos[:k]].copy()
+        return a
+    if kind == "Organ pipe":
+        return np.concatenate([a[0::2], a[1::2][::-1]])
+    raise ValueError(f"Unknown workload: {kind}")
+
+# ---------------------------
+# Algorithm Registry
+# ---------------------------
+# Single dispatch table for the page, Auto mode and the benchmarks. "traced" is
+# the step-recording teaching version (None for engines that record no steps);
+# "variant_of" marks an alternative engine for another entry, offered on the
+# page as an Engine choice rather than as its own algorithm.
+SORTS = {
+    "Bubble Sort": {
+        "traced": bubble_sort, "kernel": bubble_sort_kernel, "numpy": False,
+        "complexity": "n^2", "stable": True, "memory": "O(1)",
+        "favours": "tiny arrays; teaching only",
+    },
+    "Insertion Sort": {
+        "traced": insertion_sort, "kernel": insertion_sort_kernel, "numpy": False,
+        "complexity": "n^2", "stable": True, "memory": "O(1)",
+        "favours": "tiny or nearly sorted arrays (O(n + inversions))",
+    },
+    "Merge Sort": {
+        "traced": merge_sort, "kernel": merge_sort_kernel, "numpy": False,
+        "complexity": "n log n", "stable": True, "memory": "O(n)",
+        "favours": "any order, many duplicates; guaranteed n log n",
+    },
+    "Natural Merge Sort": {
+        "traced": natural_merge_sort, "kernel": natural_merge_sort_kernel, "numpy": False,
+        "complexity": "n log n", "stable": True, "memory": "O(n)",
+        "favours": "inputs made of a few long ascending runs",
+    },
+    "Quick Sort": {
+        "traced": quick_sort, "kernel": quick_sort_kernel, "numpy": False,
+        "complexity": "n log n", "stable": False, "memory": "O(log n) stack",
+        "favours": "random distinct keys; degrades on sorted input and duplicates",
+    },
+    "Quick Sort (Introsort)": {
+        "traced": introsort, "kernel": introsort_kernel, "numpy": False,
+        "complexity": "n log n", "stable": False, "memory": "O(log n) stack",
+        "favours": "general-purpose: sorted, reversed and duplicate-heavy input alike",
+    },
+    "Heap Sort": {
+        "traced": heap_sort, "kernel": heap_sort_kernel, "numpy": False,
+        "complexity": "n log n", "stable": False, "memory": "O(1)",
+        "favours": "worst-case guarantees with no extra memory",
+    },
+    "Counting Sort": {
+        "traced": counting_sort, "kernel": counting_sort_kernel, "numpy": False,
+        "complexity": "n", "stable": True, "memory": "O(n + k)",
+        "favours": "integers with a key range close to n",
+    },
+    "Radix Sort": {
+        "traced": radix_sort, "kernel": radix_sort_kernel, "numpy": False,
+        "complexity": "n", "stable": True, "memory": "O(n)",
+        "favours": "non-negative integers with few digits",
+    },
+    "Counting Sort (NumPy)": {
+        "traced": None, "kernel": numpy_counting_sort, "numpy": True,
+        "variant_of": "Counting Sort", "engine": "Fast (NumPy)",
+        "complexity": "n", "stable": True, "memory": "O(n + k)",
+        "favours": "large integer arrays with a narrow key range",
+    },
+    "Radix Sort (NumPy)": {
+        "traced": None, "kernel": numpy_radix_sort, "numpy": True,
+        "variant_of": "Radix Sort", "engine": "Fast (NumPy)",
+        "complexity": "n", "stable": True, "memory": "O(n)",
+        "favours": "large int32/int64 arrays with any key range",
+    },
+    "Merge Sort (Parallel)": {
+        "traced": None, "kernel": lambda a: parallel_merge_sort(a), "numpy": True,
+        "variant_of": "Merge Sort", "engine": "Parallel (multi-core)",
+        "complexity": "n log n", "stable": True, "memory": "O(n) shared",
+        "favours": "large arrays on multi-core machines",
+    },
+}
+
+def run_sort(algo, arr):
+    # Returns (sorted list, trace or None)
+    spec = SORTS[algo]
+    if spec["traced"] is None:
+        return spec["kernel"](np.array(arr, dtype=np.int64)).tolist(), None
+    return spec["traced"](arr)
+
+# ---------------------------
+# Adaptive Selection (Auto mode)
+# ---------------------------
+AUTO_SAMPLE_SIZE = 4096
+
+def profile_input(arr):
+    # Presortedness and duplicates are estimated on an evenly strided sample;
+    # min/max are exact since they are single C-level passes.
+    n = len(arr)
+    step = max(1, n // AUTO_SAMPLE_SIZE)
+    sample = arr[::step]
+    m = len(sample)
+    descents = sum(1 for i in range(1, m) if sample[i] < sample[i - 1])
+    ints = all(type(x) is int for x in sample)
+    lo, hi = (min(arr), max(arr)) if n else (0, 0)
+    return {
+        "n": n,
+        "runs": descents + 1,
+        "sortedness": 1 - descents / (m - 1) if m > 1 else 1.0,
+        "duplicate_ratio": 1 - len(set(sample)) / m if m else 0.0,
+        "integers": ints,
+        "key_range": hi - lo + 1,
+        "negative": lo < 0,
+    }
+
+def choose_algorithm(profile):
+    n = profile["n"]
+    if n <= 16:
+        return "Insertion Sort", "tiny input: insertion sort has the lowest overhead"
+    if profile["sortedness"] >= 0.95:
+        if n <= 64:
+            return "Insertion Sort", "nearly sorted and small: few inversions to fix"
+        return "Natural Merge Sort", f"nearly sorted ({profile['runs']} runs in the sample)"
+    if profile["integers"]:
+        narrow = profile["key_range"] <= max(COUNTING_RANGE_FACTOR * n, 1024)
+        if narrow:
+            if n >= 5_000:
+                return "Counting Sort (NumPy)", "narrow integer key range on a large array"
+            return "Counting Sort", f"integer key range {profile['key_range']:,} is close to n"
+        if n >= 5_000:
+            return "Radix Sort (NumPy)", "large integer array with a wide key range"
+    if profile["duplicate_ratio"] > 0.3:
+        return "Quick Sort (Introsort)", "many duplicate keys: three-way partitioning groups them"
+    if profile["sortedness"] <= 0.05:
+        return "Quick Sort (Introsort)", "nearly reversed: median-of-three pivots stay balanced"
+    return "Quick Sort", "random-looking distinct keys: Lomuto quick sort has the least overhead"
+
+# ---------------------------
+# Instrumentation
+# ---------------------------
+# Counters come from the trace; peak memory is measured with tracemalloc on a
+# separate run of the uninstrumented kernel so neither the trace nor tracemalloc
+# itself pollutes the other numbers.
+def kernel_input(algo, arr):
+    return np.array(arr, dtype=np.int64) if SORTS[algo]["numpy"] else list(arr)
+
+def peak_memory(algo, arr):
+    data = kernel_input(algo, arr)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        SORTS[algo]["kernel"](data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return max(peak - base, 0)
+
+# ---------------------------
+# Benchmark Harness
+# ---------------------------
+COMPLEXITY_MODELS = {
+    "n^2": lambda n: n * n,
+    "n log n": lambda n: n * np.log2(n),
+    "n": lambda n: n,
+}
+
+# Largest size worth timing per class; bigger sizes are skipped, not extrapolated.
+MAX_BENCH_SIZE = {"n^2": 5_000, "n log n": 1_000_000, "n": 1_000_000}
+
+BENCH_SIZES = [100, 300, 1_000, 3_000, 10_000, 30_000, 100_000, 300_000, 1_000_000]
+
+def time_kernel(kernel, data, repeats=5, warmup=1, budget_ns=None):
+    # With a budget, warmups and repeats stop once their total time exceeds it;
+    # at least one timed sample is always taken.
+    spent = 0
+    for _ in range(warmup):
+        if budget_ns is not None and spent > budget_ns:
+            break
+        t0 = time.perf_counter_ns()
+        kernel(data.copy())
+        spent += time.perf_counter_ns() - t0
+    samples = []
+    for _ in range(repeats):
+        if samples and budget_ns is not None and spent > budget_ns:
+            break
+        a = data.copy()
+        t0 = time.perf_counter_ns()
+        kernel(a)
+        t1 = time.perf_counter_ns()
+        samples.append(t1 - t0)
+        spent += t1 - t0
+    return samples
+
+def fit_complexity(sizes, times, model):
+    # Least-squares fit of times ~ c * f(n); returns c and R^2 of the fit.
+    f = np.array([COMPLEXITY_MODELS[model](n) for n in sizes], dtype=float)
+    t = np.array(times, dtype=float)
+    c = float(f @ t / (f @ f))
+    ss_res = float(((t - c * f) ** 2).sum())
+    ss_tot = float(((t - t.mean()) ** 2).sum())
+    r2 = 1 - ss_res / ss_tot if ss_tot > 0 else 1.0
+    return c, r2
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "commit": commit,
+    }
+
+# Stop growing n once one run takes (or is predicted to take) longer than this,
+# e.g. a quadratic blow-up on an adversarial workload, rather than hanging the
+# page. It also caps the total warmup + repeat time spent at any one size.
+BENCH_TIME_BUDGET_S = 10
+
+def run_benchmark(algo, sizes, repeats=5, warmup=1, seed=0, progress=None, workload="Random"):
+    model = SORTS[algo]["complexity"]
+    sizes = [n for n in sizes if n <= MAX_BENCH_SIZE[model]]
+    rows = []
+    stopped_at = None
+    budget_ns = BENCH_TIME_BUDGET_S * 1e9
+    grow = COMPLEXITY_MODELS[model]
+    for idx, n in enumerate(sizes):
+        # Scale the previous size's median by the model's growth and skip this
+        # size (and all larger ones) if a single run would blow the budget
+        if rows and rows[-1]["median_ns"] * grow(n) / grow(rows[-1]["n"]) > budget_ns:
+            stopped_at = n
+            break
+        data = generate_workload(workload, n, seed)
+        if not SORTS[algo]["numpy"]:
+            data = data.tolist()
+        samples = time_kernel(SORTS[algo]["kernel"], data, repeats, warmup, budget_ns)
+        q1, median, q3 = np.percentile(samples, [25, 50, 75])
+        rows.append({"n": n, "median_ns": float(median), "q1_ns": float(q1),
+                     "q3_ns": float(q3), "samples_ns": samples})
+        if progress is not None:
+            progress.progress((idx + 1) / len(sizes), text=f"{algo}: n = {n:,}")
+        if median > budget_ns and idx + 1 < len(sizes):
+            stopped_at = sizes[idx + 1]
+            break
+    c, r2 = fit_complexity([r["n"] for r in rows], [r["median_ns"] for r in rows], model)
+    return {
+        "algorithm": algo,
+        "workload": workload,
+        "stopped_at": stopped_at,
+        "repeats": repeats,
+        "warmup": warmup,
+        "seed": seed,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "fit": {"model": model, "coefficient_ns": c, "r2": r2},
+        "results": rows,
+    }
+
+def plot_benchmark(bench, compare=None):
+    fig, ax = plt.subplots()
+    rows = bench["results"]
+    n = np.array([r["n"] for r in rows], dtype=float)
+    med = np.array([r["median_ns"] for r in rows]) / 1e9
+    err = [med - np.array([r["q1_ns"] for r in rows]) / 1e9,
+           np.array([r["q3_ns"] for r in rows]) / 1e9 - med]
+    ax.errorbar(n, med, yerr=err, marker='o', capsize=3, label="Median (IQR)")
+    fit = bench["fit"]
+    grid = np.geomspace(n.min(), n.max(), 50)
+    ax.plot(grid, fit["coefficient_ns"] * COMPLEXITY_MODELS[fit["model"]](grid) / 1e9,
+            linestyle='--', label=f"Fit: c·{fit['model']} (R² = {fit['r2']:.3f})")
+    if compare is not None:
+        label = compare["machine"].get("commit") or compare["machine"].get("node") or "previous"
+        ax.plot([r["n"] for r in compare["results"]],
+                [r["median_ns"] / 1e9 for r in compare["results"]],
+                marker='s', linestyle=':', label=f"Previous run ({label})")
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("Input Size")
+    ax.set_ylabel("Time (s)")
+    ax.set_title(f"{bench['algorithm']} on {bench.get('workload', 'Random')} input: "
+                 f"Measured vs Fitted {fit['model']}")
+    ax.legend()
+    return fig
+
+# ---------------------------
+# Parallel Merge Sort (shared memory)
+# ---------------------------
+# Stage 1 copies the input into a shared-memory int64 buffer and sorts equal
+# chunks in worker processes. Stage 2 is a k-way merge split by value
+# (merge path): every worker owns one output range, cuts the same key interval
+# out of each sorted chunk with a binary search and heap-merges it into the
+# output buffer. Workers exchange data only through the shared buffers; they
+# are started by parallel_sort.run_workers (see parallel_sort.py).
+
+def parallel_merge_sort(arr, workers=None):
+    a = np.asarray(arr, dtype=np.int64)
+    n = a.size
+    workers = max(1, min(workers or os.cpu_count() or 1, n // 2 or 1))
+    if workers == 1:
+        return np.array(merge_sort_kernel(a.tolist()), dtype=np.int64)
+
+    src = shared_memory.SharedMemory(create=True, size=n * 8)
+    dst = shared_memory.SharedMemory(create=True, size=n * 8)
+    try:
+        buf = np.ndarray((n,), dtype=np.int64, buffer=src.buf)
+        buf[:] = a
+        starts = np.linspace(0, n, workers + 1).astype(int)
+        chunks = list(zip(starts[:-1].tolist(), starts[1:].tolist()))
+        run_workers(sort_chunk, [(src.name, n, lo, hi) for lo, hi in chunks])
+
+        # Splitters from a regular sample of every sorted chunk
+        sample = np.sort(np.concatenate([buf[lo:hi:max(1, (hi - lo) // 64)] for lo, hi in chunks]))
+        splitters = sample[(np.arange(1, workers) * len(sample)) // workers]
+        cuts = [np.concatenate(([0], np.searchsorted(buf[lo:hi], splitters, side="left"), [hi - lo]))
+                for lo, hi in chunks]
+        tasks = []
+        out_lo = 0
+        for p in range(workers):
+            ranges = [(lo + int(c[p]), lo + int(c[p + 1])) for (lo, _), c in zip(chunks, cuts)]
+            tasks.append((src.name, dst.name, n, ranges, out_lo))
+            out_lo += sum(hi - lo for lo, hi in ranges)
+        run_workers(merge_segment, tasks)
+        result = np.ndarray((n,), dtype=np.int64, buffer=dst.buf).copy()
+        del buf
+    finally:
+        src.close()
+        src.unlink()
+        dst.close()
+        dst.unlink()
+    return result
+
+def parallel_scaling(n, max_workers, repeats=3, seed=0, progress=None):
+    data = np.random.default_rng(seed).integers(0, 10 * n, n)
+    rows = []
+    for w in range(1, max_workers + 1):
+        samples = time_kernel(lambda a: parallel_merge_sort(a, w), data, repeats, warmup=0)
+        rows.append({"workers": w, "median_ns": float(np.median(samples))})
+        if progress is not None:
+            progress.progress(w / max_workers, text=f"{w} worker(s)")
+    base = rows[0]["median_ns"]
+    for row in rows:
+        row["speedup"] = base / row["median_ns"]
+    return rows
+
+# ---------------------------
+# External Merge Sort (out-of-core)
+# ---------------------------
+# Phase 1 reads the input in run_size chunks (raw int64 blocks, or CSV read in
+# CSV_READ_BYTES pieces and split into tokens, so line length does not matter),
+# sorts each chunk in memory and writes it to a temp run file. Phase 2 merges at
+# most fan_in runs at a time through a bounded heap, reading and writing in
+# EXTERNAL_BLOCK-element buffers, until one run is left. bytes_read counts file
+# bytes consumed (f.tell() deltas), not the size of the decoded arrays.
+EXTERNAL_BLOCK = 1 << 16
+CSV_READ_BYTES = 1 << 20
+CSV_MAX_TOKEN = 64
+
+# Server-side input files must live under this directory (EXTERNAL_SORT_DIR in
+# the environment, default ./data); anything that resolves outside it is refused.
+EXTERNAL_SORT_DIR = os.path.realpath(os.environ.get("EXTERNAL_SORT_DIR", "data"))
+
+def resolve_server_file(name):
+    path = os.path.realpath(os.path.join(EXTERNAL_SORT_DIR, name))
+    if os.path.commonpath([EXTERNAL_SORT_DIR, path]) != EXTERNAL_SORT_DIR or not os.path.isfile(path):
+        raise ValueError(f"'{name}' is not a file inside {EXTERNAL_SORT_DIR}")
+    return path
+
+def _iter_run(path, stats):
+    with open(path, "rb") as f:
+        while True:
+            pos = f.tell()
+            block = np.fromfile(f, dtype=np.int64, count=EXTERNAL_BLOCK)
+            stats["bytes_read"] += f.tell() - pos
+            if block.size == 0:
+                return
+            yield from block.tolist()
+
+def _write_merged(values, out, stats, text, on_block=None):
+    buf = array("q")
+    for v in values:
+        buf.append(v)
+        if len(buf) >= EXTERNAL_BLOCK:
+            stats["bytes_written"] += _flush(buf, out, text)
+            if on_block is not None:
+                on_block(EXTERNAL_BLOCK)
+            buf = array("q")
+    if buf:
+        stats["bytes_written"] += _flush(buf, out, text)
+        if on_block is not None:
+            on_block(len(buf))
+
+def _flush(buf, out, text):
+    if text:
+        data = ("\n".join(map(str, buf)) + "\n").encode()
+        out.write(data)
+        return len(data)
+    buf.tofile(out)
+    return len(buf) * buf.itemsize
+
+def _binary_chunks(path, run_size, stats):
+    if os.path.getsize(path) % 8:
+        raise ValueError("Binary input size is not a multiple of 8 bytes (int64).")
+    with open(path, "rb") as f:
+        while True:
+            pos = f.tell()
+            chunk = np.fromfile(f, dtype=np.int64, count=run_size)
+            stats["bytes_read"] += f.tell() - pos
+            if chunk.size == 0:
+                return
+            yield chunk
+
+def _csv_chunks(path, run_size, stats):
+    pending, count, tail = [], 0, b""
+    with open(path, "rb") as f:
+        while True:
+            pos = f.tell()
+            block = f.read(CSV_READ_BYTES)
+            stats["bytes_read"] += f.tell() - pos
+            data = tail + block
+            # Digits at the end of a block may continue in the next one
+            cut = len(data.rstrip(b"+-0123456789")) if block else len(data)
+            data, tail = data[:cut], data[cut:]
+            if len(tail) > CSV_MAX_TOKEN:
+                raise ValueError(f"CSV token longer than {CSV_MAX_TOKEN} bytes: {tail[:20]!r}...")
+            tokens = data.replace(b",", b" ").split()
+            if tokens:
+                pending.append(np.fromiter(map(int, tokens), dtype=np.int64, count=len(tokens)))
+                count += len(tokens)
+            while count >= run_size or (not block and count):
+                values = np.concatenate(pending)
+                yield values[:run_size].copy()
+                rest = values[run_size:]
+                pending, count = ([rest] if rest.size else []), rest.size
+            if not block:
+                return
+
+def external_sort(src_path, fmt, out_path, run_size=1_000_000, fan_in=16, progress=None):
+    stats = {"elements": 0, "runs": 0, "merge_passes": 0, "bytes_read": 0, "bytes_written": 0}
+    tmp_dir = tempfile.mkdtemp(prefix="external_sort_")
+    runs = []
+    try:
+        total = os.path.getsize(src_path)
+        chunks = (_binary_chunks if fmt == "binary" else _csv_chunks)(src_path, run_size, stats)
+        for chunk in chunks:
+            chunk.sort(kind="stable")
+            path = os.path.join(tmp_dir, f"run_{len(runs)}.bin")
+            chunk.tofile(path)
+            stats["bytes_written"] += chunk.nbytes
+            stats["elements"] += chunk.size
+            runs.append(path)
+            if progress is not None and total:
+                progress(min(stats["bytes_read"] / total, 1.0) * 0.5, f"Run {len(runs)} written")
+        stats["runs"] = len(runs)
+
+        passes = max(1, int(np.ceil(np.log(max(len(runs), 1)) / np.log(fan_in)))) if len(runs) > 1 else 1
+        done = [0]
+        def on_block(count):
+            done[0] += count
+            if progress is not None and stats["elements"]:
+                progress(0.5 + 0.5 * min(done[0] / (stats["elements"] * passes), 1.0),
+                         f"Merge pass {stats['merge_passes'] + 1}")
+
+        # Intermediate passes write raw int64 runs; the last pass writes the output format
+        while len(runs) > fan_in:
+            merged = []
+            for g in range(0, len(runs), fan_in):
+                group = runs[g:g + fan_in]
+                path = os.path.join(tmp_dir, f"pass{stats['merge_passes']}_{len(merged)}.bin")
+                with open(path, "wb") as out:
+                    _write_merged(heapq.merge(*(_iter_run(r, stats) for r in group)),
+                                  out, stats, False, on_block)
+                for r in group:
+                    os.remove(r)
+                merged.append(path)
+            runs = merged
+            stats["merge_passes"] += 1
+        with open(out_path, "wb") as out:
+            _write_merged(heapq.merge(*(_iter_run(r, stats) for r in runs)),
+                          out, stats, fmt == "csv", on_block)
+        stats["merge_passes"] += 1
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if progress is not None:
+        progress(1.0, "Done")
+    return stats
+
+# ---------------------------
+# Step Renderer (single canvas)
+# ---------------------------
+# One figure and one bar container per run; frames only update bar heights.
+class BarRenderer:
+    def __init__(self, values, title):
+        self.title = title
+        self.fig, self.ax = plt.subplots()
+        self.bars = self.ax.bar(range(len(values)), values, color='skyblue')
+        lo, hi = min(min(values), 0), max(max(values), 0)
+        pad = (hi - lo) * 0.05 or 1
+        self.ax.set_ylim(lo - pad if lo < 0 else 0, hi + pad)
+
+    def draw(self, values, label):
+        for bar, h in zip(self.bars, values):
+            bar.set_height(h)
+        self.ax.set_title(f"{self.title} - {label}")
+        return self.fig
+
+    def animation_gif(self, replay, max_frames=150, interval=80, height=240):
+        # Pre-encodes an evenly sampled subset of frames into one animated GIF.
+        # Bars are rasterised straight into NumPy pixel arrays, bypassing matplotlib.
+        total = replay.n_frames
+        if total <= max_frames:
+            indices = list(range(1, total + 1))
+        else:
+            indices = sorted(set(np.linspace(1, total, max_frames).astype(int).tolist()))
+        frames = [replay.frame(0)] + [values for _, values in replay.frames(indices)]
+
+        n = len(frames[0])
+        cols = np.arange(n) if n <= 960 else np.linspace(0, n - 1, 960).astype(int)
+        n = len(cols)
+        scale = max(1, 480 // n)
+        lo, hi = self.ax.get_ylim()
+        rows = np.linspace(hi, lo, height)[:, None]
+        gap = np.ones(n * scale, dtype=bool)
+        if scale >= 3:
+            gap[scale - 1::scale] = False
+        images = []
+        for values in frames:
+            v = np.repeat(np.asarray(values, dtype=float)[cols], scale)[None, :]
+            mask = ((rows <= v) & (rows >= 0)) | ((rows >= v) & (rows <= 0))
+            img = Image.fromarray((mask & gap).astype(np.uint8), mode="P")
+            img.putpalette([255, 255, 255, 135, 206, 235])
+            images.append(img)
+        buf = BytesIO()
+        images[0].save(buf, format="GIF", save_all=True, append_images=images[1:],
+                       duration=interval, loop=0, optimize=False)
+        return buf.getvalue()
+
+    def close(self):
+        plt.close(self.fig)
+
+# ---------------------------
+# Result Cache (shared, bounded LRU)
+# ---------------------------
+# Sorts, traces, benchmark sweeps and rendered artefacts are memoised under a
+# hash of (kind, algorithm, input, options). The cache lives in-process (via
+# st.cache_resource) rather than st.cache_data so traces are kept as live
+# objects instead of being pickled on every hit.
+SORT_CACHE_MAX_ENTRIES = 32
+SORT_CACHE_TTL = 3600  # seconds
+
+@st.cache_resource
+def result_cache():
+    return {"entries": OrderedDict(), "hits": 0, "misses": 0, "lock": threading.Lock()}
+
+def cache_key(*parts):
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+def cache_get(cache, key):
+    with cache["lock"]:
+        item = cache["entries"].get(key)
+        if item is not None and time.time() - item[0] < SORT_CACHE_TTL:
+            cache["entries"].move_to_end(key)
+            cache["hits"] += 1
+            return item[1]
+        if item is not None:
+            del cache["entries"][key]
+        cache["misses"] += 1
+        return None
+
+def cache_put(cache, key, value):
+    with cache["lock"]:
+        cache["entries"][key] = (time.time(), value)
+        cache["entries"].move_to_end(key)
+        while len(cache["entries"]) > SORT_CACHE_MAX_ENTRIES:
+            cache["entries"].popitem(last=False)
+
+# One Run Sort click: optional Auto selection, the sort (traced when instrumented)
+# and its replay, counters and memory profile
+def compute_run(algo, arr, auto, instrument=True):
+    run_algo = algo
+    auto_info = None
+    if auto:
+        profile = profile_input(arr)
+        run_algo, reason = choose_algorithm(profile)
+        auto_info = {"profile": profile, "reason": reason, "picked": algo, "chosen": run_algo}
+        # Time both uninstrumented kernels on this input to show what Auto saved
+        for key, name in (("chosen_ns", run_algo), ("picked_ns", algo)):
+            if len(arr) > MAX_BENCH_SIZE[SORTS[name]["complexity"]]:
+                auto_info[key] = None
+                continue
+            auto_info[key] = float(np.median(time_kernel(SORTS[name]["kernel"],
+                                                         kernel_input(name, arr), 3, 1)))
+    if not instrument:
+        data = kernel_input(run_algo, arr)
+        start = time.perf_counter()
+        result = SORTS[run_algo]["kernel"](data)
+        end = time.perf_counter()
+        return {
+            "algo": run_algo,
+            "result": result.tolist() if isinstance(result, np.ndarray) else result,
+            "trace": None,
+            "replay": None,
+            "elapsed": end - start,
+            "auto": auto_info,
+            "metrics": None,
+            "artefacts": {},
+        }
+
+    start = time.perf_counter()
+    result, trace = run_sort(run_algo, arr.copy())
+    end = time.perf_counter()
+    metrics = trace.counts() if trace is not None else {}
+    metrics["instrumented_ns"] = (end - start) * 1e9
+    metrics["kernel_ns"] = float(np.median(time_kernel(SORTS[run_algo]["kernel"],
+                                                       kernel_input(run_algo, arr), 3, 0)))
+    metrics["instrumentation_ns"] = max(metrics["instrumented_ns"] - metrics["kernel_ns"], 0.0)
+    metrics["peak_memory_bytes"] = peak_memory(run_algo, arr)
+    metrics["trace_bytes"] = trace.nbytes() if trace is not None else 0
+    return {
+        "algo": run_algo,
+        "result": result,
+        "trace": trace,
+        "replay": TraceReplay(trace) if trace is not None else None,
+        "elapsed": end - start,
+        "auto": auto_info,
+        "metrics": metrics,
+        "artefacts": {},
+    }
 
 # ---------------------------
 # PDF Export Utility
 # ---------------------------
-def generate_pdf(algo_name, result, steps):
+# Reports are built only on request and never list every step: the caller picks
+# a bounded set of frames, which are replayed lazily and written one at a time.
+PDF_MAX_STEPS = 1000
+PDF_MAX_VALUES = 60  # values printed per array line
+
+def select_report_frames(n_frames, mode, k=10, first_last=25):
+    if mode == "Summary only" or n_frames == 0:
+        return []
+    if mode == "Every k-th step":
+        frames = list(range(k, n_frames + 1, k))
+        if not frames or frames[-1] != n_frames:
+            frames.append(n_frames)
+    else:
+        head = range(1, min(first_last, n_frames) + 1)
+        tail = range(max(first_last + 1, n_frames - first_last + 1), n_frames + 1)
+        frames = list(head) + list(tail)
+    if len(frames) > PDF_MAX_STEPS:
+        # Keep the final (sorted) frame when truncating
+        frames = frames[:PDF_MAX_STEPS - 1] + [n_frames]
+    return frames
+
+def format_values(values):
+    if len(values) <= PDF_MAX_VALUES:
+        return str(list(values))
+    shown = ", ".join(map(str, values[:PDF_MAX_VALUES]))
+    return f"[{shown}, ... ({len(values) - PDF_MAX_VALUES:,} more)]"
+
+def report_charts(algo_name, result, replay):
+    # Final array and a heatmap of up to 200 evenly spaced frames, as PNG files
+    paths = []
+    fig, ax = plt.subplots(figsize=(8, 3))
+    ax.bar(range(len(result)), result, color='skyblue')
+    ax.set_title(f"{algo_name} - Final Array")
+    paths.append(_save_chart(fig))
+    if replay is not None and replay.n_frames > 0:
+        picks = sorted(set(np.linspace(0, replay.n_frames, 200).astype(int).tolist()))
+        rows = [replay.frame(0)] + [v for _, v in replay.frames([f for f in picks if f > 0])]
+        fig, ax = plt.subplots(figsize=(8, 4))
+        ax.imshow(np.array(rows, dtype=float), aspect="auto", cmap="viridis", interpolation="nearest")
+        ax.set_xlabel("Index")
+        ax.set_ylabel("Sampled step")
+        ax.set_title(f"{algo_name} - Progress over {replay.n_frames:,} steps")
+        paths.append(_save_chart(fig))
+    return paths
+
+def _save_chart(fig):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp_img:
+        fig.savefig(tmp_img.name, dpi=100, bbox_inches="tight")
+    plt.close(fig)
+    return tmp_img.name
+
+def generate_pdf(algo_name, result, replay, metrics=None, frames=(), elapsed=None):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", "B", 16)
     pdf.cell(0, 10, f"{algo_name} - Sorting Report", ln=True)
 
     pdf.set_font("Arial", size=12)
+    pdf.cell(0, 8, f"Input size: {len(result):,}", ln=True)
+    if elapsed is not None:
+        pdf.cell(0, 8, f"Time taken: {elapsed:.6f} seconds", ln=True)
+    if replay is not None:
+        pdf.cell(0, 8, f"Recorded steps: {replay.n_frames:,} ({len(replay.trace):,} operations)", ln=True)
     pdf.cell(0, 10, "Final Sorted Array:", ln=True)
-    pdf.multi_cell(0, 10, f"{result}")
+    pdf.multi_cell(0, 8, format_values(result))
+
+    if metrics:
+        pdf.cell(0, 10, "Metrics:", ln=True)
+        for name, value in metrics.items():
+            pdf.cell(0, 8, f"{name.replace('_', ' ').capitalize()}: {value:,.0f}", ln=True)
+
+    charts = report_charts(algo_name, result, replay)
+    try:
+        for path in charts:
+            pdf.add_page()
+            pdf.image(path, x=10, w=190)
+    finally:
+        for path in charts:
+            os.remove(path)
 
-    pdf.cell(0, 10, "Sorting Steps:", ln=True)
-    for idx, step in enumerate(steps, 1):
-        pdf.multi_cell(0, 10, f"Step {idx}: {step}")
+    if replay is not None and frames:
+        pdf.add_page()
+        pdf.cell(0, 10, f"Sorting Steps ({len(frames):,} of {replay.n_frames:,}):", ln=True)
+        pdf.set_font("Arial", size=9)
+        for idx, step in replay.frames(frames):
+            pdf.multi_cell(0, 5, f"Step {idx}: {format_values(step)}")
 
     return pdf.output(dest="S").encode("latin1")
 
 # ---------------------------
 # UI & Controls
 # ---------------------------
-algo = st.selectbox("Choose Algorithm", [
-    "Bubble Sort", "Insertion Sort", "Merge Sort",
-    "Quick Sort", "Heap Sort", "Counting Sort", "Radix Sort"
-])
+algo = st.selectbox("Choose Algorithm", [name for name, spec in SORTS.items() if "variant_of" not in spec])
+
+variants = {spec["engine"]: name for name, spec in SORTS.items() if spec.get("variant_of") == algo}
+if variants:
+    engine = st.radio("Engine", ["Teaching (Python, step trace)"] + list(variants), horizontal=True)
+    algo = variants.get(engine, algo)
+
+spec = SORTS[algo]
+st.caption(f"O({spec['complexity']}) time, {spec['memory']} extra memory, "
+           f"{'stable' if spec['stable'] else 'not stable'} — favours {spec['favours']}.")
+auto = st.checkbox("Auto-select the fastest algorithm for this input")
+instrument = st.checkbox("Collect operation counters, memory profile and step trace", value=True,
+                         help="Turn off to run the uninstrumented kernel at full speed.")
 
 size = st.slider("Default Input Size (used if no custom array)", 5, 50, 10)
+workload = st.selectbox("Input distribution (used if no custom array)", WORKLOADS)
+seed = st.number_input("Random seed", value=42, step=1)
 user_input = st.text_input("Enter your array (comma-separated):", "")
 
 if user_input.strip():
     try:
         arr = [int(x.strip()) for x in user_input.split(",")]
+        if not all(INT64_MIN <= x <= INT64_MAX for x in arr):
+            raise OverflowError
         st.success(f"Using custom array: {arr}")
+    except OverflowError:
+        st.error(f"Values must lie between {INT64_MIN:,} and {INT64_MAX:,} (64-bit integers).")
+        arr = generate_workload(workload, size, int(seed), max_value=100).tolist()
     except:
         st.error("Invalid input! Please enter integers separated by commas.")
-        arr = random.sample(range(1, 100), size)
+        arr = generate_workload(workload, size, int(seed), max_value=100).tolist()
 else:
-    arr = random.sample(range(1, 100), size)
-    st.info(f"Using random array: {arr}")
+    arr = generate_workload(workload, size, int(seed), max_value=100).tolist()
+    st.info(f"Using {workload.lower()} array (seed {int(seed)}): {arr}")
+
+cache = result_cache()
 
 if st.button("Run Sort"):
-    start = time.time()
-    arr_copy = arr.copy()
-    if algo == "Bubble Sort":
-        result, steps = bubble_sort(arr_copy)
-    elif algo == "Insertion Sort":
-        result, steps = insertion_sort(arr_copy)
-    elif algo == "Merge Sort":
-        result, steps = merge_sort(arr_copy)
-    elif algo == "Quick Sort":
-        result, steps = quick_sort(arr_copy)
-    elif algo == "Heap Sort":
-        result, steps = heap_sort(arr_copy)
-    elif algo == "Counting Sort":
-        result, steps = counting_sort(arr_copy)
-    elif algo == "Radix Sort":
-        result, steps = radix_sort(arr_copy)
-    end = time.time()
+    key = cache_key("sort", algo, tuple(arr), auto, instrument)
+    run = cache_get(cache, key)
+    if run is None:
+        run = compute_run(algo, arr, auto, instrument)
+        cache_put(cache, key, run)
+    # Keep the run across reruns so the frame scrubber can move without re-sorting
+    st.session_state["sort_run"] = run
+
+run = st.session_state.get("sort_run")
+if run is not None:
+    run_algo = run["algo"]
+    result = run["result"]
+    trace = run["trace"]
+    replay = run["replay"]
+
+    auto_info = run.get("auto")
+    if auto_info is not None:
+        p = auto_info["profile"]
+        st.info(f"Auto chose **{auto_info['chosen']}** — {auto_info['reason']}. "
+                f"(n = {p['n']:,}, runs ≈ {p['runs']}, sortedness {p['sortedness']:.2f}, "
+                f"duplicates {p['duplicate_ratio']:.0%}, key range {p['key_range']:,})")
+        chosen_ns, picked_ns = auto_info["chosen_ns"], auto_info["picked_ns"]
+        if auto_info["chosen"] == auto_info["picked"]:
+            st.caption("Auto agreed with your pick.")
+        elif chosen_ns is not None and picked_ns is not None:
+            st.caption(f"Kernel time: {chosen_ns / 1e6:.3f} ms vs {picked_ns / 1e6:.3f} ms for "
+                       f"{auto_info['picked']} — saved {(picked_ns - chosen_ns) / 1e6:.3f} ms "
+                       f"({picked_ns / max(chosen_ns, 1):.1f}x).")
+        else:
+            st.caption(f"{auto_info['picked']} was not timed: this input is too large for its "
+                       f"complexity class.")
 
     st.success(f"Sorted: {result}")
-    st.info(f"Time Taken: {end - start:.6f} seconds")
+    st.info(f"Time Taken: {run['elapsed']:.6f} seconds")
+    metrics = run.get("metrics")
+    if metrics:
+        if "comparisons" in metrics:
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Comparisons", f"{metrics['comparisons']:,}")
+            m2.metric("Swaps", f"{metrics['swaps']:,}")
+            m3.metric("Writes", f"{metrics['writes']:,}")
+            m4.metric("Aux allocations", f"{metrics['allocations']:,}",
+                      help=f"{metrics['allocated_elements']:,} elements allocated in total")
+        st.caption(f"Kernel peak memory (tracemalloc): {metrics['peak_memory_bytes']:,} bytes. "
+                   f"Instrumentation cost: {metrics['instrumentation_ns'] / 1e6:.3f} ms "
+                   f"(traced run {metrics['instrumented_ns'] / 1e6:.3f} ms vs uninstrumented "
+                   f"kernel {metrics['kernel_ns'] / 1e6:.3f} ms).")
+    if run_algo.startswith("Counting Sort"):
+        plan = counting_plan(trace.initial if trace is not None else result)
+        if plan["strategy"] == "dense":
+            st.caption(f"Counting strategy: dense count array over key range {plan['span']:,} "
+                       f"(~{plan['bytes']:,} bytes)")
+        else:
+            st.caption(f"Counting strategy: hash-map over distinct keys — a dense array for key "
+                       f"range {plan['span']:,} would need ~{plan['bytes']:,} bytes")
+    if trace is not None:
+        st.caption(f"Trace: {len(trace)} operations, {replay.n_frames} frames, "
+                   f"{trace.nbytes()} bytes")
 
     st.subheader("Step-by-Step Visualization")
-    for i, step in enumerate(steps):
-        fig, ax = plt.subplots()
-        ax.bar(range(len(step)), step, color='skyblue')
-        ax.set_title(f"{algo} - Step {i + 1}")
-        st.pyplot(fig)
+    if trace is None and metrics is None:
+        st.info("Instrumentation is off, so no steps were recorded.")
+    elif trace is None:
+        st.info(f"The {SORTS[run_algo]['engine']} engine does not record steps.")
+    elif result:
+        renderer = BarRenderer(trace.initial, run_algo)
+        if replay.n_frames > 0:
+            frame_no = st.slider("Frame", 0, replay.n_frames, replay.n_frames)
+        else:
+            frame_no = 0
+        st.pyplot(renderer.draw(replay.frame(frame_no), f"Step {frame_no}"))
+
+        if st.checkbox("Play as animation"):
+            max_frames = st.slider("Animation frames (sampled evenly)", 10, 500, 150)
+            st.image(renderer.animation_gif(replay, max_frames=max_frames),
+                     caption=f"{run_algo} - {min(max_frames, replay.n_frames)} sampled steps")
+        renderer.close()
 
     st.subheader("Download Results")
-    df_result = pd.DataFrame({"Sorted Array": result})
-    csv_result = df_result.to_csv(index=False).encode()
-    file_name = f"{algo.replace(' ', '_').lower()}_result.csv"
+    artefacts = run["artefacts"]
+    if "csv" not in artefacts:
+        artefacts["csv"] = pd.DataFrame({"Sorted Array": result}).to_csv(index=False).encode()
+    csv_result = artefacts["csv"]
+    file_name = f"{run_algo.replace(' ', '_').lower()}_result.csv"
     st.download_button(
         label="Download CSV",
         data=csv_result,
         file_name=file_name,
         mime="text/csv"
     )
+    if metrics:
+        if "metrics_csv" not in artefacts:
+            artefacts["metrics_csv"] = pd.DataFrame(
+                [{"Algorithm": run_algo, "n": len(result), **metrics}]).to_csv(index=False).encode()
+        st.download_button(
+            label="Download Metrics CSV",
+            data=artefacts["metrics_csv"],
+            file_name=f"{run_algo.replace(' ', '_').lower()}_metrics.csv",
+            mime="text/csv"
+        )
+
+    with st.expander("PDF report"):
+        n_frames = replay.n_frames if replay is not None else 0
+        pdf_mode = st.radio("Steps to include", ["First and last N", "Every k-th step", "Summary only"],
+                            horizontal=True)
+        pdf_k = pdf_n = None
+        if pdf_mode == "Every k-th step":
+            pdf_k = st.number_input("k", min_value=1, value=max(1, n_frames // 100), step=1)
+        elif pdf_mode == "First and last N":
+            pdf_n = st.number_input("N", min_value=1, value=25, step=1)
+        pdf_key = ("pdf", pdf_mode, pdf_k, pdf_n)
+        if pdf_key not in artefacts and st.button("Prepare PDF report"):
+            frames = select_report_frames(n_frames, pdf_mode, pdf_k or 1, pdf_n or 1)
+            with st.spinner("Building report..."):
+                artefacts[pdf_key] = generate_pdf(run_algo, result, replay, metrics, frames,
+                                                  run["elapsed"])
+        if pdf_key in artefacts:
+            pdf_name = f"{run_algo.replace(' ', '_').lower()}_result.pdf"
+            st.download_button(
+                label="Download PDF",
+                data=artefacts[pdf_key],
+                file_name=pdf_name,
+                mime="application/pdf"
+            )
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+st.subheader("Complexity Benchmark")
+st.caption("Times the uninstrumented kernel with perf_counter_ns: warmup runs, then "
+           "repeated trials summarised by median and IQR, fitted to the theoretical curve.")
+bcol1, bcol2, bcol3 = st.columns(3)
+with bcol1:
+    bench_max = st.select_slider("Largest input size", BENCH_SIZES, value=10_000)
+with bcol2:
+    bench_repeats = st.slider("Trials per size", 3, 15, 5)
+with bcol3:
+    bench_warmup = st.slider("Warmup runs", 0, 3, 1)
+bcol4, bcol5 = st.columns(2)
+with bcol4:
+    bench_workload = st.selectbox("Benchmark workload", WORKLOADS)
+with bcol5:
+    bench_seed = st.number_input("Benchmark seed", value=0, step=1)
+
+if st.button("Run Benchmark"):
+    sizes = [n for n in BENCH_SIZES if n <= bench_max]
+    key = cache_key("benchmark", algo, tuple(sizes), bench_repeats, bench_warmup, int(bench_seed),
+                    bench_workload)
+    bench = cache_get(cache, key)
+    if bench is None:
+        progress = st.progress(0.0)
+        bench = run_benchmark(algo, sizes, bench_repeats, bench_warmup, int(bench_seed), progress,
+                              bench_workload)
+        progress.empty()
+        cache_put(cache, key, bench)
+    st.session_state["benchmark"] = bench
+
+bench = st.session_state.get("benchmark")
+if bench is not None:
+    skipped = [n for n in BENCH_SIZES if n <= bench_max and n > MAX_BENCH_SIZE[bench["fit"]["model"]]]
+    if bench.get("stopped_at"):
+        st.warning(f"Stopped before n = {bench['stopped_at']:,}: one run at that size would take longer "
+                   f"than {BENCH_TIME_BUDGET_S} s on this workload (measured or predicted from the "
+                   "previous size).")
+    if skipped:
+        st.warning(f"Skipped sizes above {MAX_BENCH_SIZE[bench['fit']['model']]:,} for an "
+                   f"O({bench['fit']['model']}) algorithm: {skipped}")
+    df_bench = pd.DataFrame([{k: v for k, v in r.items() if k != "samples_ns"}
+                             for r in bench["results"]])
+    st.dataframe(df_bench)
+
+    previous = st.file_uploader("Compare with a previous benchmark JSON", type="json")
+    compare = json.load(previous) if previous else None
+    fig = plot_benchmark(bench, compare)
+    st.pyplot(fig)
+    plt.close(fig)
 
-    pdf_file = generate_pdf(algo, result, steps)
-    pdf_name = f"{algo.replace(' ', '_').lower()}_result.pdf"
     st.download_button(
-        label="Download PDF",
-        data=pdf_file,
-        file_name=pdf_name,
-        mime="application/pdf"
+        label="Download Benchmark JSON",
+        data=json.dumps(bench, indent=2).encode(),
+        file_name=f"{bench['algorithm'].replace(' ', '_').lower()}_benchmark.json",
+        mime="application/json"
     )
 
-    st.subheader("Complexity Comparison")
-    sizes = list(range(5, 100, 5))
-    times = []
-    for s in sizes:
-        a = random.sample(range(1, 1000), s)
-        t0 = time.time()
-        if algo == "Bubble Sort":
-            bubble_sort(a)
-        elif algo == "Insertion Sort":
-            insertion_sort(a)
-        elif algo == "Merge Sort":
-            merge_sort(a)
-        elif algo == "Quick Sort":
-            quick_sort(a)
-        elif algo == "Heap Sort":
-            heap_sort(a)
-        elif algo == "Counting Sort":
-            counting_sort(a)
-        elif algo == "Radix Sort":
-            radix_sort(a)
-        t1 = time.time()
-        times.append(t1 - t0)
+st.subheader("Parallel Merge Sort Scaling")
+st.caption(f"Speedup of the shared-memory parallel merge sort over 1..N worker processes "
+           f"({os.cpu_count()} CPU cores detected).")
+pcol1, pcol2 = st.columns(2)
+with pcol1:
+    scale_n = st.select_slider("Array size", [10_000, 100_000, 300_000, 1_000_000], value=100_000)
+with pcol2:
+    scale_workers = st.slider("Max workers", 1, max(2, os.cpu_count() or 1), min(4, os.cpu_count() or 1))
+
+if st.button("Run Scaling Test"):
+    progress = st.progress(0.0)
+    st.session_state["scaling"] = parallel_scaling(scale_n, scale_workers, seed=int(bench_seed),
+                                                   progress=progress)
+    progress.empty()
 
+scaling = st.session_state.get("scaling")
+if scaling is not None:
+    st.dataframe(pd.DataFrame(scaling))
     fig, ax = plt.subplots()
-    ax.plot(sizes, times, label="Experimental Time", marker='o')
-    if algo in ["Bubble Sort", "Insertion Sort"]:
-        theory = [s ** 2 for s in sizes]
-    elif algo in ["Merge Sort", "Quick Sort", "Heap Sort"]:
-        theory = [s * np.log2(s) for s in sizes]
-    elif algo in ["Counting Sort", "Radix Sort"]:
-        theory = [s for s in sizes]
-    else:
-        theory = times
-    theory_scaled = [t / max(theory) * max(times) for t in theory]
-    ax.plot(sizes, theory_scaled, label="Theoretical Trend", linestyle='--')
-    ax.set_xlabel("Input Size")
-    ax.set_ylabel("Time (s)")
-    ax.set_title(f"{algo}: Theoretical vs Experimental")
+    w = [r["workers"] for r in scaling]
+    ax.plot(w, [r["speedup"] for r in scaling], marker='o', label="Measured speedup")
+    ax.plot(w, w, linestyle='--', label="Ideal (linear)")
+    ax.set_xlabel("Worker processes")
+    ax.set_ylabel("Speedup vs 1 worker")
+    ax.set_title("Parallel Merge Sort Scaling")
     ax.legend()
     st.pyplot(fig)
+    plt.close(fig)
+
+# ---------------------------
+# External Sort (uploaded files)
+# ---------------------------
+st.subheader("External Merge Sort (files larger than RAM)")
+st.caption("Sorts a raw little-endian int64 file (.bin) or a CSV of integers in bounded memory: "
+           "sorted runs are spilled to temp files and k-way merged with a bounded heap.")
+uploaded = st.file_uploader("Upload integer file", type=["bin", "csv", "txt"])
+server_name = st.text_input(f"…or a file name inside {EXTERNAL_SORT_DIR}", "",
+                            help="Uploads are held in memory; large files should be copied into "
+                                 "this directory (set EXTERNAL_SORT_DIR to change it) and sorted in place.")
+ecol1, ecol2, ecol3 = st.columns(3)
+with ecol1:
+    ext_format = st.radio("Format", ["binary", "csv"], horizontal=True)
+with ecol2:
+    ext_run_size = st.select_slider("Run size (elements)", [10_000, 100_000, 1_000_000, 10_000_000],
+                                    value=1_000_000)
+with ecol3:
+    ext_fan_in = st.slider("Merge fan-in", 2, 64, 16)
+
+if st.button("Run External Sort") and (uploaded is not None or server_name.strip()):
+    # Only one sorted output is kept per session: the previous one is deleted
+    # here, and a TemporaryDirectory also removes itself when the session ends.
+    previous = st.session_state.pop("external_sort", None)
+    if previous is not None:
+        previous["work_dir"].cleanup()
+    work_dir = tempfile.TemporaryDirectory(prefix="external_sort_out_")
+    upload_path = os.path.join(work_dir.name, "input")
+    out_path = os.path.join(work_dir.name, "sorted.csv" if ext_format == "csv" else "sorted.bin")
+    bar = st.progress(0.0)
+    try:
+        if uploaded is not None:
+            src_path = upload_path
+            with open(src_path, "wb") as f:
+                shutil.copyfileobj(uploaded, f, EXTERNAL_BLOCK * 8)
+        else:
+            src_path = resolve_server_file(server_name.strip())
+        stats = external_sort(src_path, ext_format, out_path, ext_run_size, ext_fan_in,
+                              progress=lambda frac, text: bar.progress(frac, text=text))
+        st.session_state["external_sort"] = {"stats": stats, "out_path": out_path,
+                                             "format": ext_format, "work_dir": work_dir}
+    except (OSError, ValueError, OverflowError) as e:
+        st.error(f"External sort failed: {e}")
+        work_dir.cleanup()
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+    bar.empty()
+
+ext_run = st.session_state.get("external_sort")
+if ext_run is not None and os.path.exists(ext_run["out_path"]):
+    stats = ext_run["stats"]
+    st.success(f"Sorted {stats['elements']:,} integers with {stats['runs']} runs and "
+               f"{stats['merge_passes']} merge pass(es).")
+    st.write(f"I/O volume: {stats['bytes_read'] / 1e6:,.1f} MB read, "
+             f"{stats['bytes_written'] / 1e6:,.1f} MB written")
+    if ext_run["format"] == "binary":
+        preview = np.fromfile(ext_run["out_path"], dtype=np.int64, count=20).tolist()
+    else:
+        preview = pd.read_csv(ext_run["out_path"], header=None, nrows=20)[0].tolist()
+    st.write("First values:", preview)
+    size_bytes = os.path.getsize(ext_run["out_path"])
+    if size_bytes <= 200 * 1024 * 1024:
+        with open(ext_run["out_path"], "rb") as f:
+            st.download_button("Download Sorted File", f, file_name=os.path.basename(ext_run["out_path"]))
+    else:
+        st.info(f"Sorted output is {size_bytes / 1e9:.2f} GB, above the 200 MB download limit.")
+    if st.button("Delete Sorted File"):
+        st.session_state.pop("external_sort")["work_dir"].cleanup()
+        st.rerun()
+
+st.divider()
+st.caption(f"Result cache: {cache['hits']} hits, {cache['misses']} misses, "
+           f"{len(cache['entries'])}/{SORT_CACHE_MAX_ENTRIES} entries")
@@ -0,0 +1,80 @@
+import heapq
+import sys
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# ---------------------------
+# Worker processes for the parallel merge sort in pages/sorting1.py. They are
+# started with forkserver (spawn where that is unavailable) rather than fork,
+# which would copy the threads of the running Streamlit server. Fresh
+# interpreters look the target up by module name, so it lives here.
+# ---------------------------
+START_METHOD = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+
+# Same top-down merge sort as the page's "Merge Sort" kernel
+def merge_sort_kernel(arr):
+    def mergeSort(l, r):
+        if l < r:
+            m = (l + r) // 2
+            mergeSort(l, m)
+            mergeSort(m + 1, r)
+            L = arr[l:m+1]
+            R = arr[m+1:r+1]
+            n1, n2 = len(L), len(R)
+            i = j = 0
+            k = l
+            while i < n1 and j < n2:
+                if L[i] <= R[j]:
+                    arr[k] = L[i]
+                    i += 1
+                else:
+                    arr[k] = R[j]
+                    j += 1
+                k += 1
+            arr[k:r+1] = L[i:] if i < n1 else R[j:]
+    mergeSort(0, len(arr) - 1)
+    return arr
+
+def sort_chunk(src_name, n, lo, hi):
+    shm = shared_memory.SharedMemory(name=src_name)
+    buf = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    buf[lo:hi] = merge_sort_kernel(buf[lo:hi].tolist())
+    del buf
+    shm.close()
+
+def merge_segment(src_name, dst_name, n, ranges, out_lo):
+    src = shared_memory.SharedMemory(name=src_name)
+    dst = shared_memory.SharedMemory(name=dst_name)
+    a = np.ndarray((n,), dtype=np.int64, buffer=src.buf)
+    out = np.ndarray((n,), dtype=np.int64, buffer=dst.buf)
+    merged = list(heapq.merge(*(a[lo:hi].tolist() for lo, hi in ranges)))
+    out[out_lo:out_lo + len(merged)] = merged
+    del a, out
+    src.close()
+    dst.close()
+
+def run_workers(target, tasks):
+    if len(tasks) == 1:
+        target(*tasks[0])
+        return
+    ctx = mp.get_context(START_METHOD)
+    if START_METHOD == "forkserver":
+        # The server imports numpy once; each worker is then a cheap fork of it
+        ctx.set_forkserver_preload([__name__])
+    # Every child re-imports the parent's __main__, which under Streamlit is the
+    # page script itself; stand this module in for it while the workers start.
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = sys.modules[__name__]
+    try:
+        procs = [ctx.Process(target=target, args=args) for args in tasks]
+        for proc in procs:
+            proc.start()
+    finally:
+        sys.modules["__main__"] = main
+    for proc in procs:
+        proc.join()
+    failed = [proc.exitcode for proc in procs if proc.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"{len(failed)} worker process(es) failed: exit codes {failed}")